@@ -21,6 +21,7 @@ if __name__ == '__main__':
       'Programming Language :: Python :: 2.5',
       'Programming Language :: Python :: 2.6',
       'Programming Language :: Python :: 2.7',
+      'Programming Language :: Python :: 3',
       'Natural Language :: English',
       'Topic :: Software Development :: Libraries :: Python Modules',
     ])
@@ -1,8 +1,17 @@
+import copy
+import sys
+import threading
 import unittest
+from io import BytesIO
+try:
+  from StringIO import StringIO
+except ImportError:
+  from io import StringIO
 from yuppy import *
+from yuppy.encoding import dumps, loads, iterload
 
+@yuppy
 class Constant(object):
-  __metaclass__ = ClassType
   foo = const('bar')
 
 class ConstantTestCase(unittest.TestCase):
@@ -14,15 +23,15 @@ class ConstantTestCase(unittest.TestCase):
       obj.foo = value
     instance = Constant()
     self.assertRaises(AttributeError, setfoo, instance, 'baz')
-    self.assertEquals(instance.foo, 'bar')
+    self.assertEqual(instance.foo, 'bar')
     # Ensure that even after changing the class constant, the object
     # constant does not change.
     self.assertRaises(AttributeError, setfoo, Constant, 'baz')
     instance = Constant()
-    self.assertEquals(instance.foo, 'bar')
+    self.assertEqual(instance.foo, 'bar')
 
+@yuppy
 class Variable(object):
-  __metaclass__ = ClassType
   foo = var(default=2, type=int, validate=lambda x: x == 1)
 
 class VariableTestCase(unittest.TestCase):
@@ -31,32 +40,478 @@ class VariableTestCase(unittest.TestCase):
   """
   def test_variable(self):
     instance = Variable()
-    self.assertEquals(instance.foo, 2)
+    self.assertEqual(instance.foo, 2)
     def setfoo(value):
       instance.foo = value
     self.assertRaises(AttributeError, setfoo, 'foo')
     self.assertRaises(AttributeError, setfoo, 2)
     setfoo(1)
 
+@yuppy
+class FactoryVariable(object):
+  foo = var(set, default_factory=set)
+
+class FactoryVariableTestCase(unittest.TestCase):
+  """
+  Default factory variable test case.
+  """
+  def test_factory_variable(self):
+    instance = FactoryVariable()
+    self.assertFalse('foo' in instance.__dict__)
+    instance.foo.add(1)
+    self.assertEqual(instance.foo, set([1]))
+    self.assertEqual(FactoryVariable().foo, set())
+    self.assertRaises(ValueError, var, default=None, default_factory=set)
+
+@tracked
+class TrackedVariable(object):
+  foo = var(int)
+  bar = var(int, default=1)
+  baz = static(int)
+
+class TrackedVariableTestCase(unittest.TestCase):
+  """
+  Tracked variable test case.
+  """
+  def test_tracked(self):
+    instance = TrackedVariable()
+    self.assertTrue(istracked(instance))
+    self.assertEqual(changed(instance), [])
+    instance.foo = 1
+    instance.baz = 1
+    self.assertEqual(changed(instance), ['foo'])
+    instance.bar = 2
+    self.assertEqual(changed(instance), ['bar', 'foo'])
+    checkpoint(instance)
+    self.assertEqual(changed(instance), [])
+    self.assertEqual(instance.foo, 1)
+    self.assertRaises(TypeError, changed, Variable())
+
+  def test_tracked_subclass(self):
+    class TrackedSubclass(TrackedVariable):
+      qux = var(int)
+    instance = TrackedSubclass()
+    instance.qux = 1
+    self.assertEqual(changed(instance), ['qux'])
+
+  def test_tracked_untracked_base(self):
+    @tracked
+    class TrackedFactory(FactoryVariable):
+      pass
+    self.assertTrue(FactoryVariable.__attributes__['foo'].__notify__)
+    instance = TrackedFactory()
+    instance.foo = set([1])
+    self.assertEqual(changed(instance), ['foo'])
+    untracked = FactoryVariable()
+    untracked.foo = set([1])
+    self.assertFalse('__changed__' in untracked.__dict__)
+
+@tracked
+class DeferredRange(object):
+  low = var(int, default=0)
+  high = var(int, default=0)
+
+  @computed('low', 'high')
+  def size(self):
+    return self.high - self.low
+
+  @invariant
+  def ordered(self):
+    return self.low <= self.high
+
+class DeferredTestCase(unittest.TestCase):
+  """
+  Deferred validation test case.
+  """
+  def test_deferred(self):
+    instance = DeferredRange()
+    with deferred(instance):
+      instance.low = 20
+      self.assertEqual(instance.size, -20)
+      with deferred(instance):
+        instance.high = 'foo'
+      instance.high = 30
+    self.assertEqual(instance.size, 10)
+    self.assertEqual(changed(instance), ['high', 'low'])
+
+  def test_copy(self):
+    instance = DeferredRange()
+    with deferred(instance):
+      instance.low = 1
+      instance.high = 3
+      duplicate = copy.copy(instance)
+      def sethigh(value):
+        duplicate.high = value
+      self.assertRaises(AttributeError, sethigh, 'foo')
+      duplicate.high = 5
+    self.assertEqual((instance.low, instance.high), (1, 3))
+    self.assertRaises(AttributeError, sethigh, 'bar')
+    duplicate.low = 2
+    self.assertEqual((instance.low, duplicate.low, duplicate.high), (1, 2, 5))
+
+  def test_rollback(self):
+    instance = DeferredRange()
+    instance.high = 10
+    checkpoint(instance)
+    self.assertEqual(instance.size, 10)
+    def update(low, high):
+      with deferred(instance):
+        instance.low = low
+        instance.high = high
+    self.assertRaises(AttributeError, update, 20, 15)
+    self.assertRaises(AttributeError, update, 1, 'foo')
+    self.assertEqual((instance.low, instance.high, instance.size), (0, 10, 10))
+    self.assertFalse('low' in instance.__dict__)
+    self.assertEqual(changed(instance), [])
+    update(20, 30)
+    self.assertEqual(instance.size, 10)
+
+  def test_threads(self):
+    instance = DeferredRange()
+    instance.high = 10
+    self.assertEqual(instance.size, 10)
+    seen = []
+    def other():
+      seen.append((instance.low, instance.size, 'low' in instance.__dict__))
+      try:
+        instance.high = 'foo'
+      except AttributeError:
+        seen.append('invalid')
+      instance.high = 40
+    with deferred(instance):
+      instance.low = 'foo'
+      instance.low = 20
+      self.assertEqual(instance.size, -10)
+      thread = threading.Thread(target=other)
+      thread.start()
+      thread.join()
+      self.assertEqual(seen, [(0, 10, False), 'invalid'])
+      self.assertEqual(instance.high, 40)
+    self.assertEqual((instance.low, instance.high, instance.size), (20, 40, 20))
+
+@yuppy
+class ComputedAttribute(object):
+  foo = var(int, default=1)
+  bar = var(int, default=2)
+  calls = 0
+
+  @computed('foo', 'bar')
+  def foobar(self):
+    self.__class__.calls += 1
+    return self.foo + self.bar
+
+class ComputedAttributeTestCase(unittest.TestCase):
+  """
+  Computed attribute test case.
+  """
+  def test_computed(self):
+    instance = ComputedAttribute()
+    self.assertEqual(instance.foobar, 3)
+    self.assertEqual(instance.foobar, 3)
+    self.assertEqual(ComputedAttribute.calls, 1)
+    instance.foo = 2
+    self.assertEqual(instance.foobar, 4)
+    self.assertEqual(ComputedAttribute.calls, 2)
+    def setfoobar(value):
+      instance.foobar = value
+    self.assertRaises(AttributeError, setfoobar, 1)
+    self.assertTrue(iscomputed(ComputedAttribute.foobar))
+    self.assertTrue(hasattr(ComputedAttribute, 'foobar'))
+
+  def test_unknown_dependency(self):
+    def bad_computed():
+      @yuppy
+      class BadComputed(object):
+        @computed('foo')
+        def bar(self):
+          pass
+    self.assertRaises(TypeError, bad_computed)
+
+@yuppy
+class EncodedPoint(object):
+  kind = const('point')
+  x = var(int)
+  y = var(int, default=0)
+  tags = var(list, default_factory=list)
+  label = var(str, default='')
+  ids = var(set, default_factory=set)
+
+@yuppy
+class EncodedLine(object):
+  start = var(EncodedPoint)
+  end = var(EncodedPoint)
+
+class ChunkedReader(object):
+  """A file object that returns a few characters per read."""
+  def __init__(self, data, chunksize=3):
+    if isinstance(data, bytes):
+      self.data = BytesIO(data)
+    else:
+      self.data = StringIO(data)
+    self.chunksize = chunksize
+    self.reads = 0
+
+  def read(self, size=-1):
+    self.reads += 1
+    return self.data.read(self.chunksize)
+
+class EncodingTestCase(unittest.TestCase):
+  """
+  JSON encoding test case.
+  """
+  def test_dumps(self):
+    point = EncodedPoint()
+    point.x = 1
+    self.assertEqual(loads(EncodedPoint, dumps(point)).__dict__, {'x': 1, 'y': 0, 'tags': [], 'label': '', 'ids': set()})
+    self.assertFalse('tags' in point.__dict__)
+
+  def test_str_and_set(self):
+    point = EncodedPoint()
+    point.x = 1
+    point.label = 'origin'
+    point.ids = set([1, 2])
+    decoded = loads(EncodedPoint, dumps(point))
+    self.assertEqual((decoded.label, decoded.ids), ('origin', set([1, 2])))
+    self.assertTrue(isinstance(decoded.label, str))
+    points = list(iterload(EncodedPoint, StringIO(u'[{"x": 1, "label": "a", "ids": [3]}]')))
+    self.assertEqual((points[0].label, points[0].ids), ('a', set([3])))
+    self.assertRaises(AttributeError, loads, EncodedPoint, '{"label": 1}')
+
+  def test_nested(self):
+    line = EncodedLine()
+    line.start = loads(EncodedPoint, '{"x": 1}')
+    line.end = loads(EncodedPoint, '{"x": 2, "y": 3}')
+    line = loads(EncodedLine, dumps(line))
+    self.assertEqual(line.end.y, 3)
+    self.assertTrue(isinstance(line.start, EncodedPoint))
+
+  def test_loads_invalid(self):
+    self.assertRaises(AttributeError, loads, EncodedPoint, '{"x": "one"}')
+    self.assertRaises(AttributeError, loads, EncodedPoint, '{"z": 1}')
+    self.assertRaises(AttributeError, loads, EncodedPoint, '{"kind": "line"}')
+    self.assertEqual(loads(EncodedPoint, '{"kind": "point", "x": 1}').x, 1)
+
+  def test_iterload(self):
+    data = ' [ {"x": 1}, {"x": "one"} ,{"x": 3, "y": 4}, {"z": 1} ] '
+    errors = []
+    points = list(iterload(EncodedPoint, ChunkedReader(data), errors))
+    self.assertEqual([(p.x, p.y) for p in points], [(1, 0), (3, 4)])
+    self.assertEqual([index for index, e in errors], [1, 3])
+    self.assertRaises(AttributeError, list, iterload(EncodedPoint, ChunkedReader(data)))
+    self.assertEqual(list(iterload(EncodedPoint, StringIO('[]'))), [])
+    points = list(iterload(EncodedPoint, BytesIO(u'[{"x": 1, "tags": ["\u00e9"]}, {"x": 2}]'.encode('utf-8'))))
+    self.assertEqual([(p.x, p.tags) for p in points], [(1, [u'\u00e9']), (2, [])])
+    points = list(iterload(EncodedPoint, ChunkedReader(u'[{"x": 1, "tags": ["\u00e9\u00e9"]}]'.encode('utf-8'), 1)))
+    self.assertEqual(points[0].tags, [u'\u00e9\u00e9'])
+    self.assertRaises(ValueError, list, iterload(EncodedPoint, StringIO('[{"x": 1} {"x": 2}]')))
+
+  def test_iterload_chunk_boundaries(self):
+    record = '{"x": -12, "tags": ["a \\"quoted\\" \\u00e9 string", true, false, null, -1.5e3, {"a": []}]}'
+    for chunksize in range(1, 40):
+      points = list(iterload(EncodedPoint, ChunkedReader(u'[%s]' % ', '.join([record] * 5), chunksize)))
+      self.assertEqual(len(points), 5)
+      self.assertEqual(points[4].tags[0], u'a "quoted" \u00e9 string')
+      self.assertEqual(points[4].tags[1:5], [True, False, None, -1500.0])
+
+  def test_iterload_scalar_boundaries(self):
+    data = u'[{"x": 1}, 12.5, {"x": 2}, -1e3, 7, {"x": 3}, 0.25E-2]'
+    for chunksize in range(1, 40):
+      errors = []
+      points = list(iterload(EncodedPoint, ChunkedReader(data, chunksize), errors))
+      self.assertEqual([p.x for p in points], [1, 2, 3])
+      self.assertEqual([(index, str(e)) for index, e in errors], [
+        (1, "Cannot decode 'EncodedPoint' from float."),
+        (3, "Cannot decode 'EncodedPoint' from float."),
+        (4, "Cannot decode 'EncodedPoint' from int."),
+        (6, "Cannot decode 'EncodedPoint' from float."),
+      ])
+
+  def test_iterload_malformed(self):
+    reader = ChunkedReader('[{"x": tru, "y": 1}, ' + ', '.join(['{"x": 1}'] * 100) + ']')
+    self.assertRaises(ValueError, list, iterload(EncodedPoint, reader))
+    self.assertTrue(reader.reads < 10)
+
+@pooled(size=1, debug=True)
+class PooledObject(object):
+  foo = var(int, default=1)
+
+  def __init__(self, bar=None):
+    self.bar = bar
+
+class PooledObjectTestCase(unittest.TestCase):
+  """
+  Pooled object test case.
+  """
+  def test_pooled(self):
+    instance = PooledObject('bar')
+    instance.foo = 2
+    release(instance)
+    self.assertRaises(ReferenceError, getattr, instance, 'foo')
+    self.assertRaises(ReferenceError, release, instance)
+    reused = PooledObject()
+    self.assertTrue(reused is instance)
+    self.assertEqual(reused.foo, 1)
+    self.assertEqual(reused.bar, None)
+    self.assertFalse(PooledObject() is reused)
+
+  def test_double_release(self):
+    @pooled(size=4)
+    class FastPooledObject(object):
+      foo = var(int, default=1)
+    instance = FastPooledObject()
+    release(instance)
+    self.assertRaises(ReferenceError, release, instance)
+    first, second = FastPooledObject(), FastPooledObject()
+    self.assertTrue(first is instance)
+    self.assertFalse(second is first)
+    self.assertEqual(first.foo, 1)
+    release(first)
+
+  def test_subclass(self):
+    class PooledSubclass(PooledObject):
+      def __init__(self, bar=None, baz=None):
+        self.bar, self.baz = bar, baz
+    instance = PooledSubclass(baz=1)
+    release(instance)
+    self.assertFalse(PooledObject() is instance)
+    reused = PooledSubclass('bar', baz=2)
+    self.assertTrue(reused is instance)
+    self.assertEqual((reused.foo, reused.bar, reused.baz), (1, 'bar', 2))
+
+  def test_threads(self):
+    @pooled(size=4)
+    class ThreadPooledObject(object):
+      foo = var(int, default=1)
+    instance = ThreadPooledObject()
+    thread = threading.Thread(target=release, args=(instance,))
+    thread.start()
+    thread.join()
+    self.assertTrue(ThreadPooledObject() is instance)
+
+  def test_not_pooled(self):
+    self.assertRaises(TypeError, release, Constant())
+
+@yuppy
+class ViewedPoint(object):
+  kind = const('point')
+  count = static(int, default=0)
+  x = var(int, default=0)
+  tags = var(list, default_factory=list)
+  next = var()
+
+  @computed('x')
+  def double(self):
+    return self.multiply(2)
+
+  def multiply(self, factor):
+    return self.x * factor
+
+class ViewTestCase(unittest.TestCase):
+  """
+  Read-only view test case.
+  """
+  def test_view(self):
+    instance = ViewedPoint()
+    instance.next = ViewedPoint()
+    readonly = view(instance)
+    self.assertTrue(isview(readonly))
+    self.assertEqual((readonly.kind, readonly.count, readonly.x, readonly.tags), ('point', 0, 0, ()))
+    instance.x = 2
+    self.assertEqual((readonly.x, readonly.double), (2, 4))
+    self.assertTrue(isview(readonly.next))
+    self.assertFalse('tags' in instance.__dict__)
+    def setx(obj, value):
+      obj.x = value
+    self.assertRaises(AttributeError, setx, readonly, 1)
+    self.assertRaises(AttributeError, setx, readonly.next, 1)
+    self.assertRaises(AttributeError, delattr, readonly, 'x')
+    self.assertTrue(view(readonly) is readonly)
+    self.assertEqual(snapshot(readonly).x, 2)
+
+  def test_snapshot(self):
+    instance = ViewedPoint()
+    instance.x = 1
+    instance.next = instance
+    frozen = snapshot(instance)
+    instance.x = 2
+    self.assertEqual((frozen.x, frozen.double), (1, 2))
+    self.assertTrue(frozen.next is frozen)
+    self.assertTrue(snapshot(frozen) is frozen)
+    self.assertEqual(instance.double, 4)
+
+  def test_no_cache(self):
+    instance = ViewedPoint()
+    instance.x = 3
+    readonly, frozen = view(instance), snapshot(instance)
+    self.assertEqual((readonly.double, readonly.tags, frozen.double), (6, (), 6))
+    self.assertEqual(sorted(instance.__dict__), ['x'])
+    self.assertEqual(instance.double, 6)
+    instance.x = 4
+    self.assertEqual((readonly.double, frozen.double), (8, 6))
+
+  def test_containers(self):
+    instance = ViewedPoint()
+    instance.tags = [ViewedPoint(), [1], {'next': ViewedPoint()}, set([2])]
+    frozen = snapshot(instance)
+    tags = view(instance).tags
+    self.assertTrue(isinstance(tags, tuple))
+    self.assertTrue(isview(tags[0]))
+    self.assertEqual((tags[1], tags[3]), ((1,), frozenset([2])))
+    self.assertTrue(isview(tags[2]['next']))
+    self.assertRaises(TypeError, tags[2].__setitem__, 'next', None)
+    self.assertRaises(TypeError, tags[2].pop, 'next')
+    instance.tags[1].append(2)
+    self.assertEqual((view(instance).tags[1], frozen.tags[1]), ((1, 2), (1,)))
+    self.assertTrue(frozen.tags[0].__frozen__)
+
+@yuppy
 class Method(object):
-  __metaclass__ = ClassType
   @method
   def foo(self):
     return 'bar'
 
+@yuppy
 class MethodParams(object):
-  __metaclass__ = ClassType
-  @params(foo=int, bar=basestring)
+  @params(foo=int, bar=str)
   def foobarbaz(self, foo, bar=None):
     pass
 
+def annotated_foobarbaz(self, foo, bar=None):
+  pass
+annotated_foobarbaz.__annotations__ = {'foo': int, 'bar': str, 'return': None}
+
+@yuppy
+class Annotated(object):
+  __annotations__ = {'foo': int, 'bar': str}
+  bar = 'bar'
+  foobarbaz = annotated_foobarbaz
+
+  def __init__(self, foo=1):
+    self.foo = foo
+  __init__.__annotations__ = {'foo': int}
+
+PY3_KWONLY = '''
+def foobarbaz(self, foo, *, bar: str = 'bar', baz: int = 1):
+  pass
+'''
+
+PY3_ANNOTATED = '''
+class AnnotatedSyntax(metaclass=ClassType):
+  foo: int = 1
+  bar: str
+  baz = var(int, default=2)
+
+  def foobar(self, foo: int, bar: (str, type(None)) = None) -> int:
+    return foo
+'''
+
 class MethodTestCase(unittest.TestCase):
   """
   Method test case.
   """
   def test_method(self):
     instance = Method()
-    self.assertEquals(instance.foo(), 'bar')
+    self.assertEqual(instance.foo(), 'bar')
 
   def test_params(self):
     instance = MethodParams()
@@ -68,8 +523,61 @@ class MethodTestCase(unittest.TestCase):
     instance.foobarbaz(foo=1, bar='two')
     instance.foobarbaz(1, bar='two')
 
+  def test_annotations(self):
+    instance = Annotated()
+    self.assertTrue(isvariable(Annotated.__attributes__['foo']))
+    self.assertEqual(instance.bar, 'bar')
+    def setfoo(value):
+      instance.foo = value
+    self.assertRaises(AttributeError, setfoo, 'foo')
+    setfoo(1)
+    self.assertRaises(TypeError, instance.foobarbaz, 1, 2)
+    instance.foobarbaz(1, bar='two')
+    self.assertRaises(TypeError, Annotated, 'one')
+
+  @unittest.skipIf(sys.version_info < (3, 6), 'class annotations require Python 3.6')
+  def test_annotation_syntax(self):
+    namespace = {'ClassType': ClassType, 'var': var}
+    exec(PY3_ANNOTATED, namespace)
+    AnnotatedSyntax = namespace['AnnotatedSyntax']
+    attrs = AnnotatedSyntax.__attributes__
+    self.assertTrue(isvariable(attrs['foo']) and isvariable(attrs['bar']))
+    self.assertEqual([attrs[name].__name__ for name in ('foo', 'bar', 'baz')], ['foo', 'bar', 'baz'])
+    instance = AnnotatedSyntax()
+    self.assertEqual((instance.foo, instance.baz), (1, 2))
+    self.assertRaises(AttributeError, getattr, instance, 'bar')
+    def setattribute(name, value):
+      setattr(instance, name, value)
+    self.assertRaises(AttributeError, setattribute, 'foo', 'one')
+    self.assertRaises(AttributeError, setattribute, 'bar', 1)
+    setattribute('bar', 'bar')
+    self.assertEqual(instance.bar, 'bar')
+    self.assertRaises(TypeError, instance.foobar, 'one')
+    self.assertRaises(TypeError, instance.foobar, 1, bar=2)
+    self.assertEqual(instance.foobar(1, 'two'), 1)
+
+  def test_set_name(self):
+    class Plain(object):
+      foo = var(int)
+    attr = Plain.__dict__['foo']
+    if sys.version_info >= (3, 6):
+      self.assertEqual(attr.__name__, 'foo')
+    self.assertEqual(yuppy(Plain).__attributes__['foo'].__name__, 'foo')
+
+  @unittest.skipIf(sys.version_info < (3,), 'keyword-only arguments require Python 3')
+  def test_keyword_only_annotations(self):
+    namespace = {}
+    exec(PY3_KWONLY, namespace)
+    KeywordOnly = yuppy(type('KeywordOnly', (object,), {'foobarbaz': namespace['foobarbaz']}))
+    instance = KeywordOnly()
+    self.assertRaises(TypeError, instance.foobarbaz, 1, bar=2)
+    self.assertRaises(TypeError, instance.foobarbaz, 1, baz='one')
+    instance.foobarbaz(1, bar='two', baz=2)
+    Explicit = yuppy(type('Explicit', (object,), {'foobarbaz': params(baz=str)(namespace['foobarbaz'])}))
+    self.assertRaises(TypeError, Explicit().foobarbaz, 1, baz=1)
+
+@yuppy
 class StaticVariable(object):
-  __metaclass__ = ClassType
   foo = static(type=int, validate=lambda x: x == 1)
 
 class StaticVariableTestCase(unittest.TestCase):
@@ -85,12 +593,11 @@ class StaticVariableTestCase(unittest.TestCase):
     self.assertRaises(AttributeError, setfoo, 2)
     setfoo(1)
     instance2 = StaticVariable()
-    self.assertEquals(instance2.foo, 1)
+    self.assertEqual(instance2.foo, 1)
 
 @final
 class Foo(object):
   """A final class."""
-  __metaclass__ = ClassType
 
 class FinalTestCase(unittest.TestCase):
   """
@@ -103,8 +610,8 @@ class FinalTestCase(unittest.TestCase):
     foo = Foo()
     self.assertRaises(TypeError, extend_final)
 
+@interface
 class FooInterface(object):
-  __metaclass__ = InterfaceType
   def foo(self):
     pass
   def bar(self):
@@ -159,12 +666,76 @@ class InterfaceTestCase(unittest.TestCase):
     instance = implement()
     self.assertFalse(instanceof(instance, FooInterface, False))
 
+class LazyFooObject(object):
+  def bar(self):
+    pass
+  def baz(self):
+    pass
+  @property
+  def foo(self):
+    return self.bar
+
+class InstancesOfTestCase(unittest.TestCase):
+  """
+  Batch interface check test case.
+  """
+  def test_instancesof(self):
+    @implements(FooInterface)
+    class FooInterfaceObject(object):
+      def foo(self):
+        pass
+      def bar(self):
+        pass
+      def baz(self):
+        pass
+    class BarObject(object):
+      def bar(self):
+        pass
+    shadowed = BarObject()
+    shadowed.foo = shadowed.baz = lambda: None
+    objects = [FooInterfaceObject(), BarObject(), LazyFooObject(), shadowed, 1, FooInterfaceObject()]
+    interfaces = [FooInterface, BarObject, callable, (FooInterface, BarObject)]
+    for ducktype in (True, False):
+      expected = [[instanceof(obj, i, ducktype) for i in interfaces] for obj in objects]
+      self.assertEqual(instancesof(objects, interfaces, ducktype), expected)
+      self.assertEqual(instancesof(objects, interfaces, ducktype, threads=4), expected)
+    self.assertEqual(instancesof(objects, [FooInterface])[1:4], [[False], [True], [True]])
+
+  def test_proxied_class(self):
+    @implements(FooInterface)
+    class FooInterfaceObject(object):
+      def foo(self):
+        pass
+      def bar(self):
+        pass
+      def baz(self):
+        pass
+    class Proxy(object):
+      @property
+      def __class__(self):
+        return FooInterfaceObject
+    objects = [Proxy(), FooInterfaceObject()]
+    interfaces = [FooInterface, FooInterfaceObject]
+    for ducktype in (True, False):
+      expected = [[instanceof(obj, i, ducktype) for i in interfaces] for obj in objects]
+      self.assertEqual(instancesof(objects, interfaces, ducktype), expected)
+    self.assertEqual(instancesof([Proxy()], [FooInterfaceObject]), [[True]])
+
 def all_tests():
+  loader = unittest.TestLoader()
   suite = unittest.TestSuite()
-  suite.addTest(unittest.makeSuite(ConstantTestCase))
-  suite.addTest(unittest.makeSuite(VariableTestCase))
-  suite.addTest(unittest.makeSuite(MethodTestCase))
-  suite.addTest(unittest.makeSuite(StaticVariableTestCase))
-  suite.addTest(unittest.makeSuite(FinalTestCase))
-  suite.addTest(unittest.makeSuite(InterfaceTestCase))
+  suite.addTest(loader.loadTestsFromTestCase(ConstantTestCase))
+  suite.addTest(loader.loadTestsFromTestCase(VariableTestCase))
+  suite.addTest(loader.loadTestsFromTestCase(FactoryVariableTestCase))
+  suite.addTest(loader.loadTestsFromTestCase(TrackedVariableTestCase))
+  suite.addTest(loader.loadTestsFromTestCase(ComputedAttributeTestCase))
+  suite.addTest(loader.loadTestsFromTestCase(DeferredTestCase))
+  suite.addTest(loader.loadTestsFromTestCase(EncodingTestCase))
+  suite.addTest(loader.loadTestsFromTestCase(PooledObjectTestCase))
+  suite.addTest(loader.loadTestsFromTestCase(ViewTestCase))
+  suite.addTest(loader.loadTestsFromTestCase(MethodTestCase))
+  suite.addTest(loader.loadTestsFromTestCase(StaticVariableTestCase))
+  suite.addTest(loader.loadTestsFromTestCase(FinalTestCase))
+  suite.addTest(loader.loadTestsFromTestCase(InterfaceTestCase))
+  suite.addTest(loader.loadTestsFromTestCase(InstancesOfTestCase))
   return suite
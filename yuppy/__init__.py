@@ -12,12 +12,24 @@ __all__ = [
   'stat',
   'isstatic',
   'isstat',
+  'computed',
+  'iscomputed',
+  'deferred',
+  'invariant',
+  'isinvariant',
   'method',
   'params',
   'abstract',
   'isabstract',
   'final',
   'isfinal',
+  'tracked',
+  'istracked',
+  'changed',
+  'checkpoint',
+  'pooled',
+  'ispooled',
+  'release',
   'ClassType',
   'yuppy',
   'isyuppy',
@@ -27,6 +39,11 @@ __all__ = [
   'isinterface',
   'implements',
   'instanceof',
+  'instancesof',
+  'codec',
+  'view',
+  'snapshot',
+  'isview',
 ]
 
 from yuppy.core import (
@@ -43,12 +60,24 @@ from yuppy.core import (
   stat,
   isstatic,
   isstat,
+  computed,
+  iscomputed,
+  deferred,
+  invariant,
+  isinvariant,
   method,
   params,
   abstract,
   isabstract,
   final,
   isfinal,
+  tracked,
+  istracked,
+  changed,
+  checkpoint,
+  pooled,
+  ispooled,
+  release,
   ClassType,
   yuppy,
   isyuppy,
@@ -58,4 +87,8 @@ from yuppy.core import (
   isinterface,
   implements,
   instanceof,
+  instancesof,
 )
+
+from yuppy.encoding import codec
+from yuppy.views import view, snapshot, isview
@@ -2,6 +2,17 @@
 # See LICENSE for details.
 from types import FunctionType, MethodType
 import inspect
+from multiprocessing.pool import ThreadPool
+
+try:
+  import annotationlib
+except ImportError:
+  annotationlib = None
+
+try:
+  from threading import get_ident as _get_ident
+except ImportError:
+  from thread import get_ident as _get_ident
 
 class Attribute(object):
   """
@@ -9,6 +20,10 @@ class Attribute(object):
   """
   __name__ = None
 
+  def __set_name__(self, owner, name):
+    """Binds the attribute name when the owning class is created."""
+    self.__name__ = name
+
 def isattribute(obj):
   """
   Returns a boolean value indicating whether an object is an attribute.
@@ -38,7 +53,7 @@ class Constant(Attribute):
     """Raises an attribute error when an attempt is made to override the constant value."""
     raise AttributeError("Cannot override constant value.")
 
-  def __del__(self, instance):
+  def __delete__(self, instance):
     """Raises an attribute error when an attempt is made to delete the constant value."""
     raise AttributeError("Cannot delete constant value.")
 
@@ -82,6 +97,14 @@ class Variable(Attribute):
       self.__hasdefault__ = True
       self.__default__ = kwargs['default']
 
+    try:
+      self.__factory__ = kwargs['default_factory']
+    except KeyError:
+      self.__factory__ = None
+    else:
+      if self.__hasdefault__:
+        raise ValueError("Cannot specify both 'default' and 'default_factory'.")
+
     try:
       self.__validate__ = kwargs['validate']
     except KeyError:
@@ -92,6 +115,9 @@ class Variable(Attribute):
     except KeyError:
       self.__interface__ = None
 
+    # Set by classes that track or compute from this variable.
+    self.__notify__ = False
+
     super(Variable, self).__init__()
 
   def _validate(self, value):
@@ -122,10 +148,17 @@ class Variable(Attribute):
 
   def __get__(self, instance=None, owner=None):
     """Gets the variable value."""
+    if _windows:
+      window = _window(instance)
+      if window is not None and self.__name__ in window.pending:
+        return window.pending[self.__name__]
     try:
       return instance.__dict__[self.__name__]
     except KeyError:
-      if self.__hasdefault__:
+      if self.__factory__ is not None:
+        value = instance.__dict__[self.__name__] = self.__factory__()
+        return value
+      elif self.__hasdefault__:
         return self.__default__
       else:
         raise AttributeError("'%s' object has no attribute '%s'." % (instance.__class__.__name__, self.__name__))
@@ -139,21 +172,64 @@ class Variable(Attribute):
     except AttributeError:
       raise AttributeError("Instance member '%s' cannot be accessed from the class scope." % (self.__name__,))
     else:
-      instance.__dict__[self.__name__] = self._validate(value)
+      window = _window(instance) if _windows else None
+      if window is None:
+        instance.__dict__[self.__name__] = self._validate(value)
+        if self.__notify__:
+          self._changed(instance)
+      else:
+        window.set(self, value)
 
-  def __del__(self, instance=None):
+  def __delete__(self, instance=None):
     """Sets the variable value to None."""
     if instance is not None:
       try:
-        instance.__dict__[self.__name__] = None
+        instance.__dict__
       except AttributeError:
         raise AttributeError("Instance member '%s' cannot be accessed from the class scope." % (self.__name__,))
+      else:
+        window = _window(instance) if _windows else None
+        if window is None:
+          instance.__dict__[self.__name__] = None
+          if self.__notify__:
+            self._changed(instance)
+        else:
+          window.delete(self)
+
+  def _changed(self, instance):
+    """
+    Records a change to the variable if the instance's class is tracked
+    and invalidates any computed attributes that depend on it.
+    """
+    fields = getattr(instance.__class__, '__fieldindex__', None)
+    if fields is not None:
+      instance.__dict__['__changed__'] = instance.__dict__.get('__changed__', 0) | fields[self.__name__]
+
+    dependents = getattr(instance.__class__, '__dependents__', None)
+    if dependents is not None:
+      for attrname in dependents.get(self.__name__, ()):
+        instance.__dict__.pop(attrname, None)
 
   def default(self, value):
     """
     Sets the variable default value.
     """
+    self.__hasdefault__ = True
     self.__default__ = value
+    self.__factory__ = None
+    return self
+
+  def factory(self, factory):
+    """
+    Sets the variable default factory.
+
+    The factory is called the first time the variable is read from an
+    instance on which it has not been set, and the result is stored on
+    that instance.
+    """
+    self.__hasdefault__ = False
+    self.__default__ = None
+    self.__factory__ = factory
     return self
 
   def validate(self, validator):
@@ -191,7 +267,10 @@ class StaticVariable(Variable):
     try:
       return self.__value__
     except AttributeError:
-      if self.__hasdefault__:
+      if self.__factory__ is not None:
+        value = self.__value__ = self.__factory__()
+        return value
+      elif self.__hasdefault__:
         return self.__default__
       else:
         raise AttributeError("'%s' object has no attribute '%s'." % (owner.__class__.__name__, self.__name__))
@@ -200,11 +279,11 @@ class StaticVariable(Variable):
     """Sets the variable value."""
     self.__value__ = self._validate(value)
 
-  def __del__(self, instance):
+  def __delete__(self, instance):
     """Deletes the variable value."""
     try:
       del self.__value__
-    except KeyError:
+    except AttributeError:
       raise AttributeError("'%s' object has no attribute '%s'." % (instance.__class__.__class__.__name__, self.__name__))
 
 def isstatic(obj):
@@ -215,6 +294,156 @@ def isstatic(obj):
 
 isstat = isstatic
 
+def deferred(obj):
+  """
+  Returns a context manager that defers validation of an object's variables.
+  """
+  return Deferred(obj)
+
+class Deferred(object):
+  """
+  A deferred validation window.
+
+  Variables set within the window are held by the window unvalidated and
+  are only visible to the thread that opened it. When the window closes
+  each of them is validated once and the class invariants are checked
+  before any of them is stored on the instance. If any check fails the
+  changes made within the window are discarded.
+  """
+  def __init__(self, instance):
+    self.instance = instance
+    self.nested = False
+    self.variables = {}
+    self.pending = {}
+    self.validate = set()
+
+  def __enter__(self):
+    if _window(self.instance) is not None:
+      self.nested = True
+    else:
+      self.key = (_get_ident(), id(self.instance))
+      _windows[self.key] = self
+    return self.instance
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    if self.nested:
+      return False
+
+    if exc_type is not None:
+      del _windows[self.key]
+      return False
+
+    # The window stays open while the invariants are checked so that they
+    # see the pending values.
+    try:
+      for attrname in self.validate:
+        self.pending[attrname] = self.variables[attrname]._validate(self.pending[attrname])
+      for attrname in getattr(self.instance.__class__, '__invariants__', ()):
+        if not getattr(self.instance, attrname)():
+          raise AttributeError("'%s' object violates invariant '%s'." % (self.instance.__class__.__name__, attrname))
+    finally:
+      del _windows[self.key]
+
+    values = self.instance.__dict__
+    for attrname, value in self.pending.items():
+      values[attrname] = value
+      variable = self.variables[attrname]
+      if variable.__notify__:
+        variable._changed(self.instance)
+    return False
+
+  def set(self, variable, value):
+    """
+    Stores an unvalidated variable value.
+    """
+    self.variables[variable.__name__] = variable
+    self.pending[variable.__name__] = value
+    self.validate.add(variable.__name__)
+
+  def delete(self, variable):
+    """
+    Records a variable deletion.
+    """
+    self.variables[variable.__name__] = variable
+    self.pending[variable.__name__] = None
+    self.validate.discard(variable.__name__)
+
+# Open deferred validation windows, keyed by the ids of the thread that
+# opened them and of their instance. Windows are kept out of the instance
+# dict so that copies of an instance made within a window do not share it.
+_windows = {}
+
+def _window(instance):
+  """
+  Returns the deferred validation window the current thread has open on
+  an instance, if any.
+  """
+  window = _windows.get((_get_ident(), id(instance)))
+  if window is not None and window.instance is instance:
+    return window
+  return None
+
+def computed(*depends):
+  """
+  Decorator for creating a computed attribute.
+  """
+  def wrap(func):
+    return Computed(func, *depends)
+  return wrap
+
+class Computed(Attribute):
+  """
+  A computed attribute.
+
+  The computed value is cached on the instance until one of the
+  variables it depends on is set. Values computed within a deferred
+  validation window are not cached.
+  """
+  def __init__(self, func, *depends):
+    self.__func__ = func
+    self.__depends__ = depends
+
+  def __get__(self, instance=None, owner=None):
+    """Gets the computed value, computing it if necessary."""
+    if instance is None:
+      return self
+    if _windows and _window(instance) is not None:
+      return self.__func__(instance)
+    try:
+      return instance.__dict__[self.__name__]
+    except KeyError:
+      value = instance.__dict__[self.__name__] = self.__func__(instance)
+      return value
+
+  def __set__(self, instance, value):
+    """Raises an attribute error when an attempt is made to set the computed value."""
+    raise AttributeError("Cannot set computed value '%s'." % (self.__name__,))
+
+  def __delete__(self, instance):
+    """Raises an attribute error when an attempt is made to delete the computed value."""
+    raise AttributeError("Cannot delete computed value '%s'." % (self.__name__,))
+
+def iscomputed(obj):
+  """
+  Indicates whether an object is a computed attribute.
+  """
+  return isinstance(obj, Computed)
+
+def _dependents(cls, attrs):
+  """
+  Maps each variable of a class to the computed attributes that depend on it.
+  """
+  dependents = {}
+  for attrname, attr in attrs.items():
+    if iscomputed(attr):
+      for depend in attr.__depends__:
+        if not isvariable(attrs.get(depend)) or isstatic(attrs.get(depend)):
+          raise TypeError("'%s' computed attribute '%s' depends on unknown variable '%s'." % (cls.__name__, attrname, depend))
+        dependents.setdefault(depend, []).append(attrname)
+  if not dependents:
+    return None
+  return dict((attrname, tuple(names)) for attrname, names in dependents.items())
+
 def method(meth):
   """
   Decorator for creating a method.
@@ -227,43 +456,41 @@ class Method(Attribute):
   """
   def __init__(self, method):
     self.__method__ = method
-    self.__method__.__spec__ = inspect.getargspec(self.__method__)
+    self.__method__.__spec__ = _getargspec(self.__method__)
     self.__params__ = None
+    self.__wrapper__ = None
 
   def __get__(self, instance=None, owner=None):
     """Gets the method, applying type hinting to method arguments."""
     if self.__params__ is None:
-      return MethodType(self.__method__, instance)
+      wrapper = self.__method__
+    else:
+      wrapper = self.__wrapper__
+      if wrapper is None:
+        wrapper = self.__wrapper__ = self._compile()
 
-    try:
-      posargs, varargs, keywords, defaults = self.__method__.__spec__
-    except AttributeError:
-      posargs, varargs, keywords, defaults = inspect.getargspec(self.__method__)
+    if instance is None:
+      return wrapper
+    return MethodType(wrapper, instance)
 
-    posargs = posargs[1:]
+  def _compile(self):
+    """
+    Compiles a wrapper that validates the typed method arguments.
+    """
+    method = self.__method__
+    validate = self.__validate_argument
+    posargs = method.__spec__[0][1:]
+    checks = tuple((i, name, self.__params__[name]) for i, name in enumerate(posargs) if name in self.__params__)
+    checks += tuple((None, name, self.__params__[name]) for name in _getkwonlyargs(method) if name in self.__params__)
 
     def wrap(inst, *args, **kwargs):
-      for i in range(len(posargs)):
-        try:
-          self.__params__[posargs[i]]
-        except KeyError:
-          continue
-
-        try:
-          arg = args[i]
-        except IndexError:
-          try:
-            arg = kwargs[posargs[i]]
-          except KeyError:
-            pass
-          else:
-            self.__validate_argument(posargs[i], arg, self.__params__[posargs[i]])
-        else:
-          self.__validate_argument(posargs[i], arg, self.__params__[posargs[i]])
-
-      return self.__method__(inst, *args, **kwargs)
-
-    return MethodType(wrap, instance)
+      for i, name, type in checks:
+        if i is not None and i < len(args):
+          validate(name, args[i], type)
+        elif name in kwargs:
+          validate(name, kwargs[name], type)
+      return method(inst, *args, **kwargs)
+    return wrap
 
   def __validate_argument(self, name, value, type):
     """
@@ -288,16 +515,39 @@ def params(**kwargs):
     if not isinstance(meth, Method):
       meth = Method(meth)
 
-    args = inspect.getargspec(meth.__method__)[0]
+    args = meth.__method__.__spec__[0] + _getkwonlyargs(meth.__method__)
 
     for key in kwargs:
       if key not in args:
         raise ValueError("Invalid parameter key '%s'. That parameter was not found." % (key,))
 
     meth.__params__ = kwargs
+    meth.__wrapper__ = None
     return meth
   return wrap
 
+def invariant(meth):
+  """
+  Decorator for creating a class invariant.
+  """
+  return InvariantMethod(meth)
+
+class InvariantMethod(Method):
+  """
+  An invariant method attribute.
+
+  Invariants are checked when a deferred validation window closes.
+  """
+  def __init__(self, method):
+    self.__invariant__ = True
+    super(InvariantMethod, self).__init__(method)
+
+def isinvariant(obj):
+  """
+  Returns a boolean value indicating whether an object is an invariant.
+  """
+  return getattr(obj, '__invariant__', False)
+
 def abstract(obj):
   """
   Makes a class or method abstract.
@@ -360,6 +610,142 @@ def isfinal(obj):
   """
   return getattr(obj, '__final__', False)
 
+def tracked(cls):
+  """
+  Makes a class track changes to its instance variables.
+  """
+  if not inspect.isclass(cls):
+    raise TypeError("Invalid tracked class %s." % (cls,))
+  if not isyuppyclass(cls):
+    cls = yuppy(cls)
+  cls.__tracked__ = True
+  attributes = cls.__attributes__
+  cls.__fieldindex__ = _fieldindex(attributes)
+  _notify(cls, attributes)
+  return cls
+
+def istracked(obj):
+  """
+  Returns a boolean value indicating whether an object tracks changes.
+  """
+  return getattr(obj, '__tracked__', False)
+
+def changed(obj):
+  """
+  Returns a list of variable names changed since the last checkpoint.
+  """
+  fields = getattr(obj.__class__, '__fieldindex__', None)
+  if fields is None:
+    raise TypeError("'%s' object does not track changes." % (obj.__class__.__name__,))
+
+  mask = obj.__dict__.get('__changed__', 0)
+  if not mask:
+    return []
+  return [attrname for attrname, bit in sorted(fields.items(), key=lambda item: item[1]) if mask & bit]
+
+def checkpoint(obj):
+  """
+  Clears the changes recorded for an object.
+  """
+  if getattr(obj.__class__, '__fieldindex__', None) is None:
+    raise TypeError("'%s' object does not track changes." % (obj.__class__.__name__,))
+  obj.__dict__.pop('__changed__', None)
+
+def _notify(cls, attrs):
+  """
+  Enables change notification for the variables a class tracks or
+  computes attributes from.
+  """
+  for attrname in list(cls.__fieldindex__ or ()) + list(cls.__dependents__ or ()):
+    attrs[attrname].__notify__ = True
+
+def _fieldindex(attrs):
+  """
+  Assigns a change bit to each instance variable in a class's attributes.
+  """
+  names = sorted(attrname for attrname, attr in attrs.items()
+                 if isvariable(attr) and not isstatic(attr))
+  return dict((attrname, 1 << i) for i, attrname in enumerate(names))
+
+class _Pool(object):
+  """
+  The settings and released instances of a pooled class.
+
+  Released instances are keyed by id. Each pool operation is a single dict
+  operation, which is atomic, so the pool is shared between threads
+  without a lock.
+  """
+  __slots__ = ('size', 'debug', 'initializer', 'instances')
+
+  def __init__(self, size, debug, initializer):
+    self.size = size
+    self.debug = debug
+    self.initializer = initializer
+    self.instances = {}
+
+# Instance pools, keyed by class. Pools are kept here rather than on their
+# classes because attribute lookups on yuppy classes are comparatively slow.
+_pools = {}
+
+def pooled(size=100, debug=False):
+  """
+  Decorator for recycling released instances of a class.
+
+  The pool holds at most size instances. In debug mode released
+  instances raise an error when they are used.
+  """
+  def wrap(cls):
+    if not inspect.isclass(cls):
+      raise TypeError("Invalid pooled class %s." % (cls,))
+    attrs = {'__module__': cls.__module__, '__doc__': cls.__doc__, '__poolsize__': size, '__pooldebug__': debug}
+    if not isyuppyclass(cls):
+      _annotate(attrs, cls.__dict__)
+    return PooledType(cls.__name__, (cls,), attrs)
+  return wrap
+
+def ispooled(obj):
+  """
+  Returns a boolean value indicating whether an object is pooled.
+  """
+  return getattr(obj, '__poolsize__', None) is not None
+
+def release(obj):
+  """
+  Resets an instance of a pooled class and returns it to the pool.
+  """
+  cls = type(obj)
+  try:
+    pool = _pools[cls]
+  except KeyError:
+    if cls is ReleasedInstance:
+      raise ReferenceError("Instance has already been released.")
+    raise TypeError("'%s' object is not pooled." % (cls.__name__,))
+
+  # Variable defaults live on the class, so clearing the instance dict
+  # resets every variable along with any cached or tracked state.
+  instances = pool.instances
+  key = id(obj)
+  if key in instances:
+    raise ReferenceError("Instance has already been released.")
+  obj.__dict__.clear()
+  if pool.debug:
+    obj.__class__ = ReleasedInstance
+  if len(instances) < pool.size:
+    instances[key] = obj
+
+class ReleasedInstance(object):
+  """
+  The class of a released instance in debug mode.
+  """
+  def __getattribute__(self, name):
+    raise ReferenceError("Cannot access attribute '%s' of a released instance." % (name,))
+
+  def __setattr__(self, name, value):
+    raise ReferenceError("Cannot set attribute '%s' of a released instance." % (name,))
+
+  def __delattr__(self, name):
+    raise ReferenceError("Cannot delete attribute '%s' of a released instance." % (name,))
+
 class StaticType(type):
   """
   A base yuppy static type.
@@ -394,14 +780,14 @@ class StaticType(type):
 
   def __setattr__(cls, name, value):
     """Prevents overriding explicitly set attributes."""
-    if isinstance(name, basestring) and not _isinternal(name):
+    if isinstance(name, str) and not _isinternal(name):
       if isattribute(cls._findattr(name, None)):
         raise AttributeError("Cannot override '%s' attribute '%s' by assignment." % (cls.__name__, name))
     super(StaticType, cls).__setattr__(name, value)
 
   def __delattr__(cls, name):
     """Prevents deleting explicitly set attributes."""
-    if isinstance(name, basestring) and not _isinternal(name):
+    if isinstance(name, str) and not _isinternal(name):
       if isattribute(cls._findattr(name, None)):
         raise AttributeError("Cannot delete '%s' attribute '%s'." % (cls.__name__, name))
     super(StaticType, cls).__delattr__(name)
@@ -410,18 +796,27 @@ class ClassType(StaticType):
   """
   A yuppy class type.
   """
+  def __new__(mcs, name, bases, attrs):
+    _annotate(attrs)
+    return super(ClassType, mcs).__new__(mcs, name, bases, attrs)
+
   def __init__(cls, name, bases, attrs):
     def get_init_wrapper(init):
       def wrapped(self, *args, **kwargs):
         if isabstract(self.__class__):
           raise TypeError("Cannot instantiate abstract class '%s'." % (self.__class__.__name__,))
         init(self, *args, **kwargs)
+      wrapped.__initializer__ = init
       return wrapped
 
-    if not attrs.has_key('__init__'):
-      init = lambda self, *args, **kwargs: None
+    if '__init__' not in attrs:
+      init = cls._findattr('__init__')
+      if init is object.__init__:
+        init = lambda self, *args, **kwargs: None
     else:
       init = attrs['__init__']
+      if isinstance(init, Method):
+        init = init.__get__(None, cls)
     cls.__init__ = get_init_wrapper(init)
 
     super(ClassType, cls).__init__(name, bases, attrs)
@@ -436,14 +831,22 @@ class ClassType(StaticType):
             elif not isinstance(getattr(cls, attrname), (FunctionType, MethodType)):
               raise TypeError("'%s' attribute '%s' is not a method." % (name, attrname))
 
+    # The class attributes are collected in the same pass as the abstract
+    # and final checks and passed to the helpers below, so the bases are
+    # only walked once per class.
+    attributes = {}
     for base in cls.__mro__:
+      if base is object:
+        continue
       if isfinal(base) and cls is not base:
         raise TypeError("Cannot override final class '%s'." % (base.__name__,))
 
       for attrname, attr in base.__dict__.items():
         if isattribute(attr):
-
-          attr.__name__ = attrname
+          if attr.__name__ is None:
+            attr.__name__ = attrname
+          if attrname not in attributes:
+            attributes[attrname] = attr
         if isabstract(attr):
           func = cls._findattr(attrname)
 
@@ -468,7 +871,7 @@ class ClassType(StaticType):
             pass
 
           try:
-            func = func.im_func
+            func = func.__func__
           except AttributeError:
             pass
 
@@ -483,23 +886,62 @@ class ClassType(StaticType):
     if class_isabstract:
       setattr(cls, '__abstract__', True)
 
+    if istracked(cls):
+      cls.__fieldindex__ = _fieldindex(attributes)
+    else:
+      cls.__fieldindex__ = None
+
+    cls.__dependents__ = _dependents(cls, attributes)
+    cls.__invariants__ = tuple(sorted(attrname for attrname, attr in attributes.items() if isinvariant(attr)))
+    _notify(cls, attributes)
+
+class PooledType(ClassType):
+  """
+  A yuppy pooled class type.
+  """
+  def __init__(cls, name, bases, attrs):
+    super(PooledType, cls).__init__(name, bases, attrs)
+    init = cls.__dict__['__init__']
+    while hasattr(init, '__initializer__'):
+      init = init.__initializer__
+    _pools[cls] = _Pool(cls.__poolsize__, cls.__pooldebug__, init)
+
+  def __call__(cls, *args, **kwargs):
+    """Reuses a released instance from the pool if possible."""
+    pool = _pools[cls]
+    obj = None
+    if pool.instances:
+      try:
+        obj = pool.instances.popitem()[1]
+      except KeyError:
+        # Another thread emptied the pool.
+        pass
+    if obj is None:
+      return super(PooledType, cls).__call__(*args, **kwargs)
+
+    # Only instantiable classes have released instances, so the abstract
+    # class check made by the wrapped __init__ can be skipped.
+    if type(obj) is not cls:
+      object.__setattr__(obj, '__class__', cls)
+    if kwargs:
+      pool.initializer(obj, *args, **kwargs)
+    else:
+      pool.initializer(obj, *args)
+    return obj
+
 def yuppy(cls):
   """
   Decorator for yuppy classes.
   """
-  class Object(cls):
-    __metaclass__ = ClassType
-  Object.__name__ = cls.__name__
-  return Object
+  attrs = {'__module__': cls.__module__, '__doc__': cls.__doc__}
+  _annotate(attrs, cls.__dict__)
+  return ClassType(cls.__name__, (cls,), attrs)
 
 def isyuppyclass(cls):
   """
   Indicates whether a class is a Yuppy class.
   """
-  try:
-    return cls.__metaclass__ is ClassType
-  except AttributeError:
-    return False
+  return isinstance(cls, ClassType)
 
 isyuppy = isyuppyclass
 
@@ -509,7 +951,7 @@ class InterfaceType(StaticType):
   """
   def __init__(cls, name, bases, attrs):
     for attrname, attr in attrs.items():
-      if isattribute(attr):
+      if isattribute(attr) and attr.__name__ is None:
         attr.__name__ = attrname
 
       if not attrname.startswith('_') and isinstance(attr, FunctionType):
@@ -525,19 +967,13 @@ def interface(cls):
   """
   Decorator for yuppy interfaces.
   """
-  class Interface(cls):
-    __metaclass__ = InterfaceType
-  Interface.__name__ = cls.__name__
-  return Interface
+  return InterfaceType(cls.__name__, (cls,), {'__module__': cls.__module__, '__doc__': cls.__doc__})
 
 def isinterface(cls):
   """
   Indicates whether the given class is an interface.
   """
-  try:
-    return cls.__metaclass__ is InterfaceType
-  except AttributeError:
-    return False
+  return isinstance(cls, InterfaceType)
 
 def instanceof(obj, interface, ducktype=True):
   """
@@ -575,6 +1011,128 @@ def instanceof(obj, interface, ducktype=True):
         return False
     return False
 
+def instancesof(objects, interfaces, ducktype=True, threads=None):
+  """
+  Returns a matrix indicating whether each object is an instance of each interface.
+
+  Objects are grouped by type and each type is checked against each
+  interface once. Objects whose attributes cannot be determined from their
+  type, or whose __class__ is not their type, are checked individually, in a pool of threads if threads is given.
+  """
+  objects = list(objects)
+  interfaces = list(interfaces)
+  names = [_requirednames(interface, ducktype) for interface in interfaces]
+
+  types = {}
+  for obj in objects:
+    types.setdefault(type(obj), None)
+
+  tasks = []
+  for cls in types:
+    tasks.append((_typeinstanceof, (cls, interfaces, names, ducktype)))
+  results = _runall(tasks, threads)
+  for cls, result in zip(list(types), results):
+    types[cls] = result
+
+  matrix = []
+  checks = []
+  for i, obj in enumerate(objects):
+    row = list(types[type(obj)])
+    values = getattr(obj, '__dict__', None)
+    # isinstance() honours a __class__ that differs from the real type.
+    proxied = getattr(obj, '__class__', None) is not type(obj)
+    for j, interface in enumerate(interfaces):
+      if proxied or row[j] is None or (values and names[j] and not names[j].isdisjoint(values)):
+        checks.append((i, j))
+    matrix.append(row)
+
+  tasks = [(instanceof, (objects[i], interfaces[j], ducktype)) for i, j in checks]
+  for (i, j), result in zip(checks, _runall(tasks, threads)):
+    matrix[i][j] = result
+  return matrix
+
+def _requirednames(interface, ducktype):
+  """
+  Returns the names of the methods an object needs to implement an interface.
+  """
+  if not ducktype:
+    return frozenset(['__interfaces__'])
+  if interface is callable:
+    return None
+
+  if not isinstance(interface, (list, tuple)):
+    interface = (interface,)
+
+  names = set()
+  for i in interface:
+    for base in i.__mro__:
+      for attrname, attr in base.__dict__.items():
+        if not _isinternal(attrname) and isinstance(getattr(base, attrname), (MethodType, FunctionType)):
+          names.add(attrname)
+  return frozenset(names)
+
+def _typeinstanceof(cls, interfaces, names, ducktype):
+  """
+  Checks a type against each interface, returning None for each
+  interface that must be checked on individual instances.
+  """
+  dynamic = cls.__getattribute__ is not object.__getattribute__ or \
+            any('__getattr__' in base.__dict__ for base in cls.__mro__)
+
+  results = []
+  for interface, required in zip(interfaces, names):
+    if interface is callable or dynamic:
+      results.append(None)
+    elif issubclass(cls, tuple(interface) if isinstance(interface, list) else interface):
+      results.append(True)
+    elif not ducktype:
+      if isinstance(interface, (list, tuple)):
+        results.append(None)
+      else:
+        results.append(interface in getattr(cls, '__interfaces__', ()))
+    elif not required:
+      results.append(False)
+    else:
+      result = True
+      for attrname in required:
+        attr = _findclassattr(cls, attrname)
+        if attr is None:
+          result = False
+          break
+        elif hasattr(attr, '__get__') and not isinstance(attr, (FunctionType, Method, staticmethod, classmethod)):
+          result = None
+          break
+        elif not isinstance(getattr(cls, attrname, None), (MethodType, FunctionType)):
+          result = False
+          break
+      results.append(result)
+  return results
+
+def _findclassattr(cls, attrname):
+  """
+  Finds an attribute in the dictionaries of a class and its bases.
+  """
+  for base in cls.__mro__:
+    try:
+      return base.__dict__[attrname]
+    except KeyError:
+      continue
+  return None
+
+def _runall(tasks, threads=None):
+  """
+  Runs a list of (function, args) tasks, optionally in a thread pool.
+  """
+  if not threads or len(tasks) < 2:
+    return [func(*args) for func, args in tasks]
+
+  pool = ThreadPool(threads)
+  try:
+    return pool.map(lambda task: task[0](*task[1]), tasks)
+  finally:
+    pool.close()
+    pool.join()
+
 def implements(interface):
   """
   Decorator for implementing an interface.
@@ -601,5 +1159,87 @@ def implements(interface):
     return Implementation
   return wrap
 
+def _annotate(attrs, namespace=None):
+  """
+  Creates variables and typed method parameters from the annotations
+  in a class namespace, storing them in the class attributes.
+  """
+  if namespace is None:
+    namespace = attrs
+
+  annotations = _getannotations(namespace)
+  for attrname, type in annotations.items():
+    if _istype(type) and not isattribute(namespace.get(attrname)):
+      if attrname in namespace:
+        attrs[attrname] = Variable(type, default=namespace[attrname])
+      else:
+        attrs[attrname] = Variable(type)
+
+  for attrname, attr in list(namespace.items()):
+    if isinstance(attr, FunctionType):
+      method = attr
+    elif isinstance(attr, Method) and attr.__params__ is None and not isabstract(attr):
+      method = attr.__method__
+    else:
+      continue
+
+    hints = getattr(method, '__annotations__', None)
+    if not hints:
+      continue
+
+    args = _getargspec(method)[0] + _getkwonlyargs(method)
+    types = dict((name, type) for name, type in hints.items() if name in args and _istype(type))
+    if types:
+      attrs[attrname] = params(**types)(attr)
+
+def _getannotations(namespace):
+  """
+  Returns the annotations defined in a class namespace.
+  """
+  try:
+    return namespace['__annotations__']
+  except KeyError:
+    pass
+
+  # As of Python 3.14 annotations are evaluated lazily, and the class
+  # namespace holds an annotate function instead of the annotations.
+  if annotationlib is None:
+    return {}
+  annotate = annotationlib.get_annotate_from_class_namespace(namespace)
+  if annotate is None:
+    return {}
+  return annotationlib.call_annotate_function(annotate, annotationlib.Format.FORWARDREF)
+
+def _istype(type):
+  """
+  Indicates whether an annotation can be used for type checking.
+  """
+  if isinstance(type, tuple):
+    return len(type) > 0 and all(inspect.isclass(t) for t in type)
+  return inspect.isclass(type)
+
+def _getargspec(func):
+  """
+  Returns the positional argument names, varargs, keywords and defaults of a function.
+  """
+  try:
+    getfullargspec = inspect.getfullargspec
+  except AttributeError:
+    return tuple(inspect.getargspec(func))
+  else:
+    spec = getfullargspec(func)
+    return (spec.args, spec.varargs, spec.varkw, spec.defaults)
+
+def _getkwonlyargs(func):
+  """
+  Returns the keyword-only argument names of a function.
+  """
+  try:
+    getfullargspec = inspect.getfullargspec
+  except AttributeError:
+    return []
+  else:
+    return getfullargspec(func).kwonlyargs
+
 def _isinternal(name):
   return name.startswith('__') and name.endswith('__')
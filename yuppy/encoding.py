@@ -0,0 +1,276 @@
+# Copyright (c) 2013 Jordan Halterman
+# See LICENSE for details.
+import codecs
+import json
+import json.scanner
+import re
+from yuppy.core import (
+  isvariable,
+  isstatic,
+  isconstant,
+  isabstract,
+  istracked,
+  isyuppyclass,
+  checkpoint,
+)
+
+try:
+  _unicode = unicode
+except NameError:
+  _unicode = str
+
+_CHUNK_SIZE = 65536
+
+# Decode errors and values this close to the end of the buffer may be
+# caused by a record that continues in the next chunk.
+_TRUNCATED_SLACK = 16
+
+def codec(cls):
+  """
+  Returns the JSON codec for a yuppy class.
+  """
+  try:
+    return cls.__dict__['__codec__']
+  except KeyError:
+    cls.__codec__ = Codec(cls)
+    return cls.__codec__
+
+class Codec(object):
+  """
+  A JSON codec generated from a yuppy class's attributes.
+  """
+  def __init__(self, cls):
+    if not isyuppyclass(cls):
+      raise TypeError("Cannot create a codec for non-yuppy class '%s'." % (cls.__name__,))
+    self.cls = cls
+
+    fields = []
+    constants = {}
+    for attrname, attr in sorted(cls.__attributes__.items()):
+      if isvariable(attr) and not isstatic(attr):
+        fields.append((attrname, attr))
+      elif isconstant(attr):
+        constants[attrname] = attr.__value__
+    self.fields = tuple(fields)
+    self.constants = constants
+    self.names = frozenset(attrname for attrname, attr in fields)
+
+  def encode(self, obj):
+    """
+    Encodes an instance as a dictionary of its declared variables.
+    """
+    values = obj.__dict__
+    data = {}
+    for attrname, attr in self.fields:
+      try:
+        value = values[attrname]
+      except KeyError:
+        if attr.__factory__ is not None:
+          value = attr.__factory__()
+        elif attr.__hasdefault__:
+          value = attr.__default__
+        else:
+          continue
+      data[attrname] = value
+    return data
+
+  def decode(self, data):
+    """
+    Decodes a dictionary into a validated instance.
+    """
+    if not isinstance(data, dict):
+      raise TypeError("Cannot decode '%s' from %s." % (self.cls.__name__, type(data).__name__))
+    if isabstract(self.cls):
+      raise TypeError("Cannot instantiate abstract class '%s'." % (self.cls.__name__,))
+
+    for key in data:
+      if key not in self.names:
+        try:
+          value = self.constants[key]
+        except KeyError:
+          raise AttributeError("'%s' object has no variable '%s'." % (self.cls.__name__, key))
+        else:
+          if data[key] != value:
+            raise AttributeError("Cannot override constant value '%s'." % (key,))
+
+    obj = self.cls.__new__(self.cls)
+    for attrname, attr in self.fields:
+      try:
+        value = data[attrname]
+      except KeyError:
+        continue
+      setattr(obj, attrname, _convert(attr, value))
+
+    if istracked(obj):
+      checkpoint(obj)
+    return obj
+
+  def dumps(self, obj, **kwargs):
+    """
+    Encodes an instance as a JSON string.
+    """
+    return json.dumps(self.encode(obj), default=_default, **kwargs)
+
+  def loads(self, s):
+    """
+    Decodes a JSON string into a validated instance.
+    """
+    return self.decode(json.loads(s))
+
+  def iterload(self, fp, errors=None):
+    """
+    Decodes a JSON array from a file object one instance at a time.
+
+    If an errors list is given, records that fail validation are skipped
+    and an (index, exception) tuple is appended to the list for each.
+    Otherwise the first invalid record raises its exception.
+    """
+    for index, data in enumerate(_iterarray(fp)):
+      try:
+        obj = self.decode(data)
+      except (AttributeError, TypeError, ValueError) as e:
+        if errors is None:
+          raise
+        errors.append((index, e))
+      else:
+        yield obj
+
+def dumps(obj, **kwargs):
+  """
+  Encodes a yuppy instance as a JSON string.
+  """
+  return codec(obj.__class__).dumps(obj, **kwargs)
+
+def loads(cls, s):
+  """
+  Decodes a JSON string into a validated instance of a yuppy class.
+  """
+  return codec(cls).loads(s)
+
+def iterload(cls, fp, errors=None):
+  """
+  Decodes a JSON array from a file object as a generator of validated
+  instances of a yuppy class.
+  """
+  return codec(cls).iterload(fp, errors)
+
+def _default(obj):
+  """
+  Encodes nested yuppy instances and sets.
+  """
+  if isyuppyclass(obj.__class__):
+    return codec(obj.__class__).encode(obj)
+  if isinstance(obj, (set, frozenset)):
+    return list(obj)
+  raise TypeError("%r is not JSON serializable." % (obj,))
+
+def _convert(attr, value):
+  """
+  Converts a decoded JSON value to the type of a variable where JSON has
+  no equivalent type.
+  """
+  types = attr.__type__
+  if types is None or isinstance(value, types):
+    return value
+  if isinstance(value, dict):
+    if len(types) == 1 and isyuppyclass(types[0]):
+      return codec(types[0]).decode(value)
+  elif isinstance(value, list):
+    for cls in types:
+      if isinstance(cls, type) and issubclass(cls, (set, frozenset)):
+        return cls(value)
+  elif isinstance(value, _unicode) and str in types:
+    # Python 2 decodes all JSON strings as unicode.
+    return value.encode('utf-8')
+  return value
+
+def _iterarray(fp):
+  """
+  Yields the items of a JSON array read incrementally from a file object.
+  """
+  decoder = json.JSONDecoder()
+  chunks = _iterchunks(fp)
+  buf = next(chunks, '')
+  eof = not buf
+  index = 0
+
+  def skip(buf, index, eof):
+    while True:
+      while index < len(buf) and buf[index].isspace():
+        index += 1
+      if index < len(buf) or eof:
+        return buf, index, eof
+      chunk = next(chunks, '')
+      buf, index, eof = buf[index:] + chunk, 0, not chunk
+
+  buf, index, eof = skip(buf, index, eof)
+  if buf[index:index+1] != '[':
+    raise ValueError("Expected a JSON array.")
+  buf, index, eof = skip(buf, index + 1, eof)
+  if buf[index:index+1] == ']':
+    return
+
+  while True:
+    while True:
+      try:
+        item, end = decoder.raw_decode(buf, index)
+      except ValueError as e:
+        if eof or not _istruncated(e, buf, index):
+          raise
+      else:
+        # A number such as 12.5 can parse as 12 if the chunk ends after "12.".
+        if end < len(buf) - _TRUNCATED_SLACK or eof:
+          break
+      chunk = next(chunks, '')
+      buf, index, eof = buf[index:] + chunk, 0, not chunk
+
+    yield item
+
+    buf, index, eof = skip(buf, end, eof)
+    if buf[index:index+1] == ']':
+      return
+    elif buf[index:index+1] != ',':
+      raise ValueError("Expected ',' or ']' at position %d." % (index,))
+    buf, index, eof = skip(buf, index + 1, eof)
+
+def _iterchunks(fp):
+  """
+  Yields non-empty text chunks read from a text or binary file object.
+  """
+  chunk = fp.read(_CHUNK_SIZE)
+  if isinstance(chunk, bytes) and not isinstance(chunk, str):
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    while chunk:
+      text = decoder.decode(chunk)
+      if text:
+        yield text
+      chunk = fp.read(_CHUNK_SIZE)
+    text = decoder.decode(b'', True)
+    if text:
+      yield text
+  else:
+    while chunk:
+      yield chunk
+      chunk = fp.read(_CHUNK_SIZE)
+
+def _istruncated(e, buf, index):
+  """
+  Indicates whether a decode error may be caused by the end of the buffer.
+  """
+  try:
+    pos, msg = e.pos, e.msg
+  except AttributeError:
+    # Python 2 only reports the position in the error message, and its C
+    # scanner omits it for nested values, so fall back to the Python scanner.
+    msg = str(e)
+    match = re.search(r'\(char (\d+)', msg)
+    if match is None:
+      decoder = json.JSONDecoder()
+      decoder.scan_once = json.scanner.py_make_scanner(decoder)
+      try:
+        decoder.raw_decode(buf, index)
+      except ValueError as e:
+        msg = str(e)
+        match = re.search(r'\(char (\d+)', msg)
+    pos = int(match.group(1)) if match else index
+  return msg.startswith(('Unterminated string', 'end is out of bounds')) or pos >= len(buf) - _TRUNCATED_SLACK
@@ -0,0 +1,185 @@
+# Copyright (c) 2013 Jordan Halterman
+# See LICENSE for details.
+from yuppy.core import (
+  isvariable,
+  isstatic,
+  isconstant,
+  iscomputed,
+  isyuppyclass,
+)
+
+def view(obj):
+  """
+  Returns a read-only view of a yuppy instance.
+
+  Reads are forwarded to the instance, so the view reflects later changes.
+  """
+  if isview(obj):
+    return obj
+  return viewtype(obj.__class__)(obj)
+
+def snapshot(obj):
+  """
+  Returns a read-only view of a yuppy instance's current values.
+
+  Only the instance dictionaries and any lists, sets and dicts in them are
+  copied. Nested yuppy instances are snapshotted as well, but other mutable
+  values are shared.
+  """
+  if isview(obj):
+    if obj.__frozen__:
+      return obj
+    obj = obj.__instance__
+  return _snapshot(obj, {})
+
+def isview(obj):
+  """
+  Indicates whether an object is a read-only view.
+  """
+  return isinstance(obj, View)
+
+def viewtype(cls):
+  """
+  Returns the read-only view class for a yuppy class.
+  """
+  try:
+    return cls.__dict__['__view__']
+  except KeyError:
+    pass
+
+  if not isyuppyclass(cls):
+    raise TypeError("Cannot create a view of non-yuppy class '%s'." % (cls.__name__,))
+
+  attrs = {'__module__': cls.__module__, '__doc__': cls.__doc__, '__slots__': ()}
+  statics = []
+  for attrname, attr in cls.__attributes__.items():
+    if isstatic(attr):
+      statics.append((attrname, attr))
+    if isstatic(attr) or isconstant(attr):
+      attrs[attrname] = property(_classgetter(cls, attrname, attr))
+    elif isvariable(attr):
+      attrs[attrname] = property(_variablegetter(attrname, attr))
+    elif iscomputed(attr):
+      attrs[attrname] = property(_computedgetter(attrname, attr))
+
+  attrs['__statics__'] = tuple(statics)
+  cls.__view__ = type(cls.__name__ + 'View', (View,), attrs)
+  return cls.__view__
+
+class View(object):
+  """
+  A read-only view of a yuppy instance.
+  """
+  __slots__ = ('__instance__', '__values__', '__frozen__')
+
+  def __init__(self, instance, frozen=False):
+    object.__setattr__(self, '__instance__', instance)
+    object.__setattr__(self, '__values__', instance.__dict__)
+    object.__setattr__(self, '__frozen__', frozen)
+
+  def __setattr__(self, name, value):
+    """Raises an attribute error when an attempt is made to set an attribute."""
+    raise AttributeError("Cannot set attribute '%s' of a read-only view." % (name,))
+
+  def __delattr__(self, name):
+    """Raises an attribute error when an attempt is made to delete an attribute."""
+    raise AttributeError("Cannot delete attribute '%s' of a read-only view." % (name,))
+
+  def __repr__(self):
+    return '<read-only view of %r>' % (self.__instance__,)
+
+class _ReadOnlyDict(dict):
+  """
+  A dict that cannot be modified.
+  """
+  __slots__ = ()
+
+  def _readonly(self, *args, **kwargs):
+    raise TypeError("Cannot modify a read-only dict.")
+
+  __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+
+def _wrap(value, wrap=view):
+  """
+  Wraps nested yuppy instances in views and copies lists, sets and dicts
+  into read-only containers.
+  """
+  if isyuppyclass(value.__class__):
+    return wrap(value)
+  elif isinstance(value, list) or type(value) is tuple:
+    return tuple(_wrap(item, wrap) for item in value)
+  elif isinstance(value, set) or type(value) is frozenset:
+    return frozenset(_wrap(item, wrap) for item in value)
+  elif isinstance(value, dict):
+    return _ReadOnlyDict((key, _wrap(item, wrap)) for key, item in value.items())
+  return value
+
+def _variablegetter(attrname, attr):
+  """
+  Creates a getter for an instance variable.
+  """
+  def get(self):
+    try:
+      value = self.__values__[attrname]
+    except KeyError:
+      if attr.__factory__ is not None:
+        value = attr.__factory__()
+      elif attr.__hasdefault__:
+        value = attr.__default__
+      else:
+        raise AttributeError("'%s' object has no attribute '%s'." % (self.__instance__.__class__.__name__, attrname))
+    return _wrap(value)
+  return get
+
+def _classgetter(cls, attrname, attr):
+  """
+  Creates a getter for a static variable or constant.
+  """
+  def get(self):
+    try:
+      value = self.__values__[attrname]
+    except KeyError:
+      value = attr.__get__(None, cls)
+    return _wrap(value)
+  return get
+
+def _computedgetter(attrname, attr):
+  """
+  Creates a getter for a computed attribute.
+  """
+  def get(self):
+    # Views may be read from other threads, so a value that is not already
+    # cached is computed without caching it on the instance.
+    try:
+      value = self.__values__[attrname]
+    except KeyError:
+      value = attr.__func__(self.__instance__)
+    return _wrap(value)
+  return get
+
+def _snapshot(obj, memo):
+  """
+  Snapshots a yuppy instance and any nested yuppy instances.
+  """
+  try:
+    return memo[id(obj)]
+  except KeyError:
+    pass
+
+  # Snapshots read from a private copy of the instance, so computed
+  # attributes can still call the class's methods.
+  cls = obj.__class__
+  shadow = object.__new__(cls)
+  values = shadow.__dict__
+  values.update(obj.__dict__)
+  memo[id(obj)] = snap = viewtype(cls)(shadow, True)
+  wrap = lambda value: _snapshot(value, memo)
+  for attrname, value in list(values.items()):
+    values[attrname] = _wrap(value, wrap)
+
+  for attrname, attr in snap.__statics__:
+    try:
+      values[attrname] = attr.__get__(None, cls)
+    except AttributeError:
+      pass
+  return snap